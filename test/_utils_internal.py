@@ -3,6 +3,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import hashlib
 import os
 import time
 from functools import wraps
@@ -10,7 +11,9 @@ from functools import wraps
 # Get relative file path
 # this returns relative path from current file.
 import pytest
+import pkg_resources
 import torch.cuda
+from tensordict.tensordict import TensorDictBase
 from torchrl._utils import seed_generator
 from torchrl.envs import EnvBase
 
@@ -40,6 +43,100 @@ def generate_seeds(seed, repeat):
     return seeds
 
 
+def assert_allclose_td_fused(
+    actual: TensorDictBase,
+    expected: TensorDictBase,
+    rtol: float = 1e-5,
+    atol: float = 1e-8,
+):
+    """Compares two tensordicts with one assert_close call per leaf dtype.
+
+    Shapes and dtypes are checked key by key. Leaves sharing a dtype are then
+    concatenated (without casting) and compared at once; if that comparison
+    fails, the offending key is looked up to be reported.
+
+    """
+    actual = actual.flatten_keys(".")
+    expected = expected.flatten_keys(".")
+    keys = sorted(actual.keys())
+    assert keys == sorted(expected.keys()), (keys, sorted(expected.keys()))
+    keys_per_dtype = {}
+    for key in keys:
+        value, expected_value = actual.get(key), expected.get(key)
+        assert (
+            value.shape == expected_value.shape
+        ), f"shape mismatch for key {key}: {value.shape} vs {expected_value.shape}"
+        assert (
+            value.dtype == expected_value.dtype
+        ), f"dtype mismatch for key {key}: {value.dtype} vs {expected_value.dtype}"
+        keys_per_dtype.setdefault(value.dtype, []).append(key)
+    for dtype_keys in keys_per_dtype.values():
+        flat_actual = torch.cat([actual.get(key).reshape(-1) for key in dtype_keys])
+        flat_expected = torch.cat([expected.get(key).reshape(-1) for key in dtype_keys])
+        try:
+            torch.testing.assert_close(
+                flat_actual, flat_expected, rtol=rtol, atol=atol, equal_nan=True
+            )
+        except AssertionError:
+            for key in dtype_keys:
+                torch.testing.assert_close(
+                    actual.get(key),
+                    expected.get(key),
+                    rtol=rtol,
+                    atol=atol,
+                    equal_nan=True,
+                    msg=lambda msg, key=key: f"key {key}: {msg}",
+                )
+            raise
+
+
+def _distribution_version(name):
+    try:
+        return pkg_resources.get_distribution(name).version
+    except pkg_resources.DistributionNotFound:
+        return "missing"
+
+
+def check_rollout_digest(request, libs, final_seed, *tensordicts):
+    """Compares seeded env outputs with the digest recorded in the pytest cache by a previous session.
+
+    This is an additional check on top of in-session determinism checks: the
+    digest is (re-)recorded without comparison if none is found or if the
+    versions of torch, numpy or of any of the listed distributions (env library
+    and simulation backends) have changed. Nothing is done if the pytest cache
+    is disabled (``-p no:cacheprovider``).
+
+    Args:
+        request: the pytest request fixture.
+        libs (sequence of str): names of the distributions producing the data
+            (e.g. ``("gym", "mujoco")``).
+        final_seed: the seed returned by ``env.set_seed``.
+        tensordicts: the tensordicts to hash.
+
+    """
+    cache = getattr(request.config, "cache", None)
+    if cache is None:
+        return
+    digest = hashlib.sha256(str(final_seed).encode())
+    for tensordict in tensordicts:
+        tensordict = tensordict.flatten_keys(".")
+        for key in sorted(tensordict.keys()):
+            digest.update(key.encode())
+            digest.update(tensordict.get(key).detach().cpu().numpy().tobytes())
+    versions = "/".join(
+        f"{name}-{_distribution_version(name)}" for name in ("torch", "numpy", *libs)
+    )
+    cache_key = (
+        "torchrl/rollout_digest/"
+        + hashlib.sha256(request.node.nodeid.encode()).hexdigest()
+    )
+    recorded = cache.get(cache_key, None)
+    if recorded is not None and recorded["versions"] == versions:
+        assert recorded["digest"] == digest.hexdigest()
+    else:
+        cache.set(cache_key, {"versions": versions, "digest": digest.hexdigest()})
+
+
 def _test_fake_tensordict(env: EnvBase):
     fake_tensordict = env.fake_tensordict().flatten_keys(".")
     real_tensordict = env.rollout(3).flatten_keys(".")
@@ -8,7 +8,7 @@ import argparse
 import numpy as np
 import pytest
 import torch
-from _utils_internal import generate_seeds
+from _utils_internal import generate_seeds, get_available_devices
 from mocking_classes import (
     ContinuousActionVecMockEnv,
     DiscreteActionConvMockEnv,
@@ -29,6 +29,7 @@ from torchrl.collectors.collectors import (
 from torchrl.collectors.utils import split_trajectories
 from torchrl.data import (
     CompositeSpec,
+    NdBoundedTensorSpec,
     NdUnboundedContinuousTensorSpec,
     UnboundedContinuousTensorSpec,
 )
@@ -957,6 +958,32 @@ def test_collector_output_keys(collector_class, init_random_frames, explicit_spe
     del collector
 
 
+@pytest.mark.parametrize("device", get_available_devices())
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+@pytest.mark.parametrize("batch_size", [(), (4,), (4, 2)])
+@pytest.mark.parametrize("shape", [(), (3,)])
+def test_random_policy_bounded(device, dtype, batch_size, shape):
+    minimum = -torch.arange(1, 4, dtype=dtype)[: shape[0] if shape else 1]
+    maximum = -minimum * 2
+    if not shape:
+        minimum, maximum = minimum.squeeze(0), maximum.squeeze(0)
+    action_spec = NdBoundedTensorSpec(
+        minimum, maximum, shape=shape, device=device, dtype=dtype
+    )
+    policy = RandomPolicy(action_spec)
+
+    torch.manual_seed(0)
+    action = policy(TensorDict({}, batch_size)).get("action")
+    assert action.shape == torch.Size([*batch_size, *shape])
+    assert action.dtype is dtype
+    assert action.device == torch.device(device)
+    assert (action >= action_spec.space.minimum).all()
+    assert (action <= action_spec.space.maximum).all()
+
+    torch.manual_seed(0)
+    torch.testing.assert_close(action, action_spec.rand(batch_size))
+
+
 @pytest.mark.skipif(not _has_gym, reason="test designed with GymEnv")
 @pytest.mark.parametrize(
     "collector_class",
@@ -25,11 +25,13 @@ from packaging import version
 from tensordict.tensordict import assert_allclose_td, TensorDict
 from torch import nn
 from torchrl.data.tensor_specs import (
+    CompositeSpec,
+    NdUnboundedContinuousTensorSpec,
     OneHotDiscreteTensorSpec,
     UnboundedContinuousTensorSpec,
 )
 from torchrl.envs import CatTensors, DoubleToFloat, EnvCreator, ObservationNorm
-from torchrl.envs.gym_like import default_info_dict_reader
+from torchrl.envs.gym_like import default_info_dict_reader, GymLikeEnv
 from torchrl.envs.libs.dm_control import _has_dmc, DMControlEnv
 from torchrl.envs.libs.gym import _has_gym, GymEnv, GymWrapper
 from torchrl.envs.transforms import (
@@ -217,6 +219,32 @@ def test_rollout_predictability(device):
     ).all()
 
 
+@pytest.mark.parametrize("device", get_available_devices())
+@pytest.mark.parametrize("max_steps", [50, 200])
+def test_rollout_out(device, max_steps):
+    env = MockSerialEnv(device=device)
+    policy = Actor(torch.nn.Linear(1, 1, bias=False)).to(device)
+    for p in policy.parameters():
+        p.data.fill_(1.0)
+    env.set_seed(100)
+    td_ref = env.rollout(policy=policy, max_steps=max_steps)
+
+    # MockSerialEnv is done after 100 steps
+    out = td_ref[0].unsqueeze(-1).expand(max_steps).to_tensordict().zero_()
+    env.set_seed(100)
+    td_out = env.rollout(policy=policy, max_steps=max_steps, out=out)
+    assert_allclose_td(td_ref, td_out)
+    if max_steps == 50:
+        # the whole buffer has been written
+        assert td_out is out
+    with pytest.raises(RuntimeError, match="return_contiguous"):
+        env.rollout(
+            policy=policy, max_steps=max_steps, out=out, return_contiguous=False
+        )
+    with pytest.raises(RuntimeError, match="missing from out"):
+        env.rollout(policy=policy, max_steps=max_steps, out=out.exclude("reward"))
+
+
 def _make_envs(
     env_name,
     frame_skip,
@@ -1080,6 +1108,68 @@ def test_info_dict_reader(seed=0):
     )
 
 
+class _MockInnerEnv:
+    def __init__(self, obs):
+        self.obs = obs
+
+    def reset(self):
+        return self.obs
+
+    def step(self, action):
+        return self.obs, np.zeros(1, dtype=np.float32), False, {}
+
+
+class _MockGymLikeEnv(GymLikeEnv):
+    """A GymLikeEnv whose observations are written in the output tensordict without encoding."""
+
+    def _check_kwargs(self, kwargs):
+        pass
+
+    def _build_env(self, obs):
+        return _MockInnerEnv(obs)
+
+    def _make_specs(self, env):
+        self.action_spec = NdUnboundedContinuousTensorSpec((1,), device=self.device)
+        self.observation_spec = CompositeSpec(
+            observation=NdUnboundedContinuousTensorSpec((3,), device=self.device)
+        )
+        self.reward_spec = UnboundedContinuousTensorSpec(device=self.device)
+
+    def _init_env(self):
+        pass
+
+    def _set_seed(self, seed):
+        return seed
+
+    def read_obs(self, observations):
+        return {"observation": observations}
+
+
+@pytest.mark.parametrize("obs_type", ["tensor", "numpy", "device"])
+def test_gym_like_validated(obs_type):
+    device = "cpu"
+    if obs_type == "device":
+        if not torch.cuda.device_count():
+            pytest.skip("no cuda device found")
+        device = "cuda:0"
+    obs = np.zeros(3) if obs_type == "numpy" else torch.zeros(3)
+    env = _MockGymLikeEnv(obs=obs, device=device)
+    assert env._validated is None
+
+    env.rand_step()
+    tensordict = env._step(TensorDict({"action": env.action_spec.rand()}, []))
+    if obs_type == "tensor":
+        # the leaves are stored as is: the checks can be skipped
+        assert env._validated
+        assert tensordict.get("observation") is obs
+    else:
+        # the leaves need a cast or a device transfer: the checks keep running
+        assert env._validated is False
+        observation = tensordict.get("observation")
+        assert isinstance(observation, torch.Tensor)
+        assert observation.device == torch.device(device)
+
+
 if __name__ == "__main__":
     args, unknown = argparse.ArgumentParser().parse_known_args()
     pytest.main([__file__, "--capture", "no", "--exitfirst"] + unknown)
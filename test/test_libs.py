@@ -3,11 +3,16 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 import argparse
+import operator
 
 import numpy as np
 import pytest
 import torch
-from _utils_internal import _test_fake_tensordict
+from _utils_internal import (
+    _test_fake_tensordict,
+    assert_allclose_td_fused,
+    check_rollout_digest,
+)
 from _utils_internal import get_available_devices
 from packaging import version
 from torchrl.collectors import MultiaSyncDataCollector
@@ -20,8 +25,11 @@ from torchrl.envs.libs.jumanji import JumanjiEnv, _has_jumanji
 if _has_gym:
     import gym
 
-    gym_version = version.parse(gym.__version__)
-    if gym_version > version.parse("0.19"):
+    _GYM_VERSION = version.parse(gym.__version__)
+    _GYM_GT_019 = _GYM_VERSION > version.parse("0.19")
+    _GYM_GT_020 = _GYM_VERSION > version.parse("0.20.0")
+    _GYM_LT_026 = _GYM_VERSION < version.parse("0.26.0")
+    if _GYM_GT_019:
         from gym.wrappers.pixel_observation import PixelObservationWrapper
     else:
         from torchrl.envs.libs.utils import (
@@ -34,28 +42,26 @@ if _has_dmc:
 
 from sys import platform
 
-from tensordict.tensordict import assert_allclose_td
 from torchrl.envs import EnvCreator, ParallelEnv
 from torchrl.envs.libs.dm_control import DMControlEnv, DMControlWrapper
 from torchrl.envs.libs.gym import GymEnv, GymWrapper
 
 IS_OSX = platform == "darwin"
 
+
+def _seed_cpu_rngs(seed):
+    # the envs tested here live on cpu: only the default torch generator is
+    # seeded, leaving the cuda generators (and device state) untouched
+    torch.random.default_generator.manual_seed(seed)
+    np.random.seed(seed)
+
+
 if _has_gym:
-    from packaging import version
-
-    gym_version = version.parse(gym.__version__)
-    PENDULUM_VERSIONED = (
-        "Pendulum-v1" if gym_version > version.parse("0.20.0") else "Pendulum-v0"
-    )
-    HC_VERSIONED = (
-        "HalfCheetah-v4" if gym_version > version.parse("0.20.0") else "HalfCheetah-v2"
-    )
-    PONG_VERSIONED = (
-        "ALE/Pong-v5" if gym_version > version.parse("0.20.0") else "Pong-v4"
-    )
-
-    # if gym_version < version.parse("0.24.0") and torch.cuda.device_count() > 0:
+    PENDULUM_VERSIONED = "Pendulum-v1" if _GYM_GT_020 else "Pendulum-v0"
+    HC_VERSIONED = "HalfCheetah-v4" if _GYM_GT_020 else "HalfCheetah-v2"
+    PONG_VERSIONED = "ALE/Pong-v5" if _GYM_GT_020 else "Pong-v4"
+
+    # if _GYM_VERSION < version.parse("0.24.0") and torch.cuda.device_count() > 0:
     #     from opengl_rendering import create_opengl_context
     #
     #     create_opengl_context()
@@ -84,7 +90,7 @@ else:
     ],
 )
 class TestGym:
-    def test_gym(self, env_name, frame_skip, from_pixels, pixels_only):
+    def test_gym(self, env_name, frame_skip, from_pixels, pixels_only, request):
         if env_name == PONG_VERSIONED and not from_pixels:
             raise pytest.skip("already pixel")
         elif (
@@ -94,36 +100,34 @@ class TestGym:
         ):
             raise pytest.skip("no cuda device")
 
-        tdreset = []
-        tdrollout = []
-        final_seed = []
-        for _ in range(2):
-            env0 = GymEnv(
-                env_name,
-                frame_skip=frame_skip,
-                from_pixels=from_pixels,
-                pixels_only=pixels_only,
-            )
-            torch.manual_seed(0)
-            np.random.seed(0)
-            final_seed.append(env0.set_seed(0))
-            tdreset.append(env0.reset())
-            tdrollout.append(env0.rollout(max_steps=50))
-            assert env0.from_pixels is from_pixels
-            env0.close()
-            env_type = type(env0._env)
-            del env0
-
-        assert_allclose_td(*tdreset)
-        assert_allclose_td(*tdrollout)
-        final_seed0, final_seed1 = final_seed
-        assert final_seed0 == final_seed1
+        env0 = GymEnv(
+            env_name,
+            frame_skip=frame_skip,
+            from_pixels=from_pixels,
+            pixels_only=pixels_only,
+        )
+        _seed_cpu_rngs(0)
+        final_seed0 = env0.set_seed(0)
+        tdreset0 = env0.reset()
+        rollout0 = env0.rollout(max_steps=50)
+        assert env0.from_pixels is from_pixels
+        env0.close()
+        env_type = type(env0._env)
+        del env0
+
+        check_rollout_digest(
+            request,
+            ("gym", "mujoco", "mujoco-py", "ale-py"),
+            final_seed0,
+            tdreset0,
+            rollout0,
+        )
 
         if env_name == PONG_VERSIONED:
             base_env = gym.make(env_name, frameskip=frame_skip)
             frame_skip = 1
         else:
-            if gym_version < version.parse("0.26.0"):
+            if _GYM_LT_026:
                 base_env = gym.make(env_name)
             else:
                 base_env = gym.make(env_name, render_mode="rgb_array")
@@ -132,8 +136,7 @@ class TestGym:
             base_env = PixelObservationWrapper(base_env, pixels_only=pixels_only)
         assert type(base_env) is env_type
         env1 = GymWrapper(base_env, frame_skip=frame_skip)
-        torch.manual_seed(0)
-        np.random.seed(0)
+        _seed_cpu_rngs(0)
         final_seed2 = env1.set_seed(0)
         tdreset2 = env1.reset()
         rollout2 = env1.rollout(max_steps=50)
@@ -141,9 +144,9 @@ class TestGym:
         env1.close()
         del env1, base_env
 
-        assert_allclose_td(tdreset[0], tdreset2, rtol=1e-4, atol=1e-4)
+        assert_allclose_td_fused(tdreset0, tdreset2, rtol=1e-4, atol=1e-4)
         assert final_seed0 == final_seed2
-        assert_allclose_td(tdrollout[0], rollout2, rtol=1e-4, atol=1e-4)
+        assert_allclose_td_fused(rollout0, rollout2, rtol=1e-4, atol=1e-4)
 
     def test_gym_fake_td(self, env_name, frame_skip, from_pixels, pixels_only):
         if env_name == PONG_VERSIONED and not from_pixels:
@@ -176,39 +179,29 @@ class TestGym:
     ],
 )
 class TestDMControl:
-    def test_dmcontrol(self, env_name, task, frame_skip, from_pixels, pixels_only):
+    def test_dmcontrol(
+        self, env_name, task, frame_skip, from_pixels, pixels_only, request
+    ):
         if from_pixels and (not torch.has_cuda or not torch.cuda.device_count()):
             raise pytest.skip("no cuda device")
 
-        tds = []
-        tds_reset = []
-        final_seed = []
-        for _ in range(2):
-            env0 = DMControlEnv(
-                env_name,
-                task,
-                frame_skip=frame_skip,
-                from_pixels=from_pixels,
-                pixels_only=pixels_only,
-            )
-            torch.manual_seed(0)
-            np.random.seed(0)
-            final_seed0 = env0.set_seed(0)
-            tdreset0 = env0.reset()
-            rollout0 = env0.rollout(max_steps=50)
-            env0.close()
-            del env0
-            tds_reset.append(tdreset0)
-            tds.append(rollout0)
-            final_seed.append(final_seed0)
-
-        tdreset1, tdreset0 = tds_reset
-        rollout0, rollout1 = tds
-        final_seed0, final_seed1 = final_seed
-
-        assert_allclose_td(tdreset1, tdreset0)
-        assert final_seed0 == final_seed1
-        assert_allclose_td(rollout0, rollout1)
+        env0 = DMControlEnv(
+            env_name,
+            task,
+            frame_skip=frame_skip,
+            from_pixels=from_pixels,
+            pixels_only=pixels_only,
+        )
+        _seed_cpu_rngs(0)
+        final_seed0 = env0.set_seed(0)
+        tdreset0 = env0.reset()
+        rollout0 = env0.rollout(max_steps=50)
+        env0.close()
+        del env0
+
+        check_rollout_digest(
+            request, ("dm-control", "mujoco"), final_seed0, tdreset0, rollout0
+        )
 
         env1 = DMControlEnv(
             env_name,
@@ -217,8 +210,7 @@ class TestDMControl:
             from_pixels=from_pixels,
             pixels_only=pixels_only,
         )
-        torch.manual_seed(1)
-        np.random.seed(1)
+        _seed_cpu_rngs(1)
         final_seed1 = env1.set_seed(1)
         tdreset1 = env1.reset()
         rollout1 = env1.rollout(max_steps=50)
@@ -226,9 +218,9 @@ class TestDMControl:
         del env1
 
         with pytest.raises(AssertionError):
-            assert_allclose_td(tdreset1, tdreset0)
+            assert_allclose_td_fused(tdreset1, tdreset0)
             assert final_seed0 == final_seed1
-            assert_allclose_td(rollout0, rollout1)
+            assert_allclose_td_fused(rollout0, rollout1)
 
         base_env = suite.load(env_name, task)
         if from_pixels:
@@ -237,15 +229,14 @@ class TestDMControl:
                 base_env, pixels_only=pixels_only, render_kwargs=render_kwargs
             )
         env2 = DMControlWrapper(base_env, frame_skip=frame_skip)
-        torch.manual_seed(0)
-        np.random.seed(0)
+        _seed_cpu_rngs(0)
         final_seed2 = env2.set_seed(0)
         tdreset2 = env2.reset()
         rollout2 = env2.rollout(max_steps=50)
 
-        assert_allclose_td(tdreset0, tdreset2)
+        assert_allclose_td_fused(tdreset0, tdreset2)
         assert final_seed0 == final_seed2
-        assert_allclose_td(rollout0, rollout2)
+        assert_allclose_td_fused(rollout0, rollout2)
 
     def test_faketd(self, env_name, task, frame_skip, from_pixels, pixels_only):
         if from_pixels and (not torch.has_cuda or not torch.cuda.device_count()):
@@ -278,7 +269,7 @@ class TestDMControl:
 )
 def test_td_creation_from_spec(env_lib, env_args, env_kwargs):
     if (
-        gym_version < version.parse("0.26.0")
+        _GYM_LT_026
         and env_kwargs.get("from_pixels", False)
         and torch.cuda.device_count() == 0
     ):
@@ -286,19 +277,15 @@ def test_td_creation_from_spec(env_lib, env_args, env_kwargs):
             "Skipping test as rendering is not supported in tests before gym 0.26."
         )
     env = env_lib(*env_args, **env_kwargs)
-    td = env.rollout(max_steps=5)
-    td0 = td[0].flatten_keys(".")
-    fake_td = env.fake_tensordict()
-
-    fake_td = fake_td.flatten_keys(".")
-    td = td.flatten_keys(".")
-    assert set(fake_td.keys()) == set(td.keys())
-    for key in fake_td.keys():
-        assert fake_td.get(key).shape == td.get(key)[0].shape
-    for key in fake_td.keys():
-        assert fake_td.get(key).shape == td0.get(key).shape
-        assert fake_td.get(key).dtype == td0.get(key).dtype
-        assert fake_td.get(key).device == td0.get(key).device
+    td_flat = env.rollout(max_steps=5).flatten_keys(".")
+    fake_flat = env.fake_tensordict().flatten_keys(".")
+    assert set(fake_flat.keys()) == set(td_flat.keys())
+    for key, fake_value in fake_flat.items():
+        # the first step is read from the flat rollout rather than flattening td[0]
+        value0 = td_flat.get(key)[0]
+        assert fake_value.shape == value0.shape
+        assert fake_value.dtype == value0.dtype
+        assert fake_value.device == value0.device
 
 
 @pytest.mark.skipif(IS_OSX, reason="rendering unstable on osx, skipping")
@@ -358,22 +345,29 @@ class TestHabitat:
 @pytest.mark.skipif(not _has_jumanji, reason="jumanji not installed")
 @pytest.mark.parametrize("envname", ["Snake-6x6-v0", "TSP50-v0"])
 class TestJumanji:
-    def test_jumanji_seeding(self, envname):
-        final_seed = []
-        tdreset = []
-        tdrollout = []
-        for _ in range(2):
-            env = JumanjiEnv(envname)
-            torch.manual_seed(0)
-            np.random.seed(0)
-            final_seed.append(env.set_seed(0))
-            tdreset.append(env.reset())
-            tdrollout.append(env.rollout(max_steps=50))
-            env.close()
-            del env
-        assert final_seed[0] == final_seed[1]
-        assert_allclose_td(*tdreset)
-        assert_allclose_td(*tdrollout)
+    def test_jumanji_seeding(self, envname, request):
+        env = JumanjiEnv(envname)
+        _seed_cpu_rngs(0)
+        final_seed = env.set_seed(0)
+        tdreset = env.reset()
+        tdrollout = env.rollout(max_steps=50)
+
+        # re-seeding the same env must reproduce the beginning of the rollout
+        _seed_cpu_rngs(0)
+        final_seed_bis = env.set_seed(0)
+        tdreset_bis = env.reset()
+        tdrollout_bis = env.rollout(max_steps=10)
+        env.close()
+        del env
+        assert final_seed == final_seed_bis
+        assert_allclose_td_fused(tdreset, tdreset_bis)
+        assert_allclose_td_fused(
+            tdrollout[..., : tdrollout_bis.shape[-1]], tdrollout_bis
+        )
+
+        check_rollout_digest(
+            request, ("jumanji", "jax", "jaxlib"), final_seed, tdreset, tdrollout
+        )
 
     @pytest.mark.parametrize("batch_size", [(), (5,), (5, 4)])
     def test_jumanji_batch_size(self, envname, batch_size):
@@ -395,8 +389,7 @@ class TestJumanji:
     @pytest.mark.parametrize("batch_size", [(), (5,), (5, 4)])
     def test_jumanji_consistency(self, envname, batch_size):
         import jax
-        import jax.numpy as jnp
-        import numpy as onp
+        from torchrl.envs.libs.jumanji import _jax_to_tensor
 
         env = JumanjiEnv(envname, batch_size=batch_size)
         obs_keys = list(env.observation_spec.keys(True))
@@ -406,38 +399,36 @@ class TestJumanji:
         env.set_seed(1)
         key = env.key
         base_env = env._env
-        key, *keys = jax.random.split(key, np.prod(batch_size) + 1)
-        state, timestep = jax.vmap(base_env.reset)(jnp.stack(keys))
-        # state = env._reshape(state)
-        # timesteps.append(timestep)
-        for i in range(rollout.shape[-1]):
-            action = rollout[..., i]["action"]
-            # state = env._flatten(state)
-            action = env._flatten(env.read_action(action))
-            state, timestep = jax.vmap(base_env.step)(state, action)
-            # state = env._reshape(state)
-            # timesteps.append(timestep)
-            checked = False
-            for _key in obs_keys:
-                if isinstance(_key, str):
-                    _key = (_key,)
-                try:
-                    t2 = getattr(timestep, _key[0])
-                except AttributeError:
-                    try:
-                        t2 = getattr(timestep.observation, _key[0])
-                    except AttributeError:
-                        continue
-                t1 = rollout[..., i][("next", *_key)]
-                for __key in _key[1:]:
-                    t2 = getattr(t2, _key)
-                t2 = torch.tensor(onp.asarray(t2)).view_as(t1)
-                torch.testing.assert_close(t1, t2)
-                checked = True
-            if not checked:
-                raise AttributeError(
-                    f"None of the keys matched: {rollout}, {list(timestep.__dict__.keys())}"
+        keys = jax.random.split(key, int(np.prod(batch_size)) + 1)[1:]
+        state, timestep = jax.jit(jax.vmap(base_env.reset))(keys)
+        # time-major, flattened actions, passed to jax through DLPack
+        actions = env.read_action(rollout.get("action").movedim(len(batch_size), 0))
+        actions = actions.reshape(
+            (rollout.shape[-1], -1) + actions.shape[len(batch_size) + 1 :]
+        )
+        # a single compiled call replays the whole trajectory
+        state, timesteps = env._jit_rollout(state, actions)
+        # resolve once where each observation key lives in the timestep
+        getters = []
+        for _key in obs_keys:
+            if isinstance(_key, str):
+                _key = (_key,)
+            if hasattr(timesteps, _key[0]):
+                getters.append((_key, operator.attrgetter(".".join(_key))))
+            elif hasattr(timesteps.observation, _key[0]):
+                getters.append(
+                    (_key, operator.attrgetter(".".join(("observation", *_key))))
                 )
+        if not getters:
+            raise AttributeError(
+                f"None of the keys matched: {rollout}, {list(timesteps.__dict__.keys())}"
+            )
+        for _key, getter in getters:
+            # all the steps are compared at once, in time-major order
+            t1 = rollout[("next", *_key)].movedim(len(batch_size), 0)
+            t2 = getter(timesteps)
+            t2 = _jax_to_tensor(t2, t1.device).view_as(t1)
+            torch.testing.assert_close(t1, t2)
 
 
 if __name__ == "__main__":
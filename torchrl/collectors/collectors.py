@@ -24,7 +24,7 @@ from torch.utils.data import IterableDataset
 from torchrl.envs.transforms import TransformedEnv
 from torchrl.envs.utils import set_exploration_mode, step_mdp
 from .._utils import _check_for_faulty_process, prod
-from ..data import TensorSpec
+from ..data import BoundedTensorSpec, TensorSpec
 from ..data.utils import CloudpickleWrapper, DEVICE_TYPING
 from ..envs.common import EnvBase
 from ..envs.vec_env import _BatchedEnv
@@ -61,9 +61,30 @@ class RandomPolicy:
 
         """
         self.action_spec = action_spec
+        # continuous bounded specs are sampled directly from cached bounds
+        self._minimum = self._interval = None
+        if isinstance(action_spec, BoundedTensorSpec) and action_spec.dtype in (
+            torch.float,
+            torch.double,
+            torch.half,
+        ):
+            self._minimum = action_spec.space.minimum
+            self._maximum = action_spec.space.maximum
+            self._interval = self._maximum - self._minimum
+            self._shape = action_spec.shape
+            self._dtype = action_spec.dtype
+            self._device = action_spec.device
 
     def __call__(self, td: TensorDictBase) -> TensorDictBase:
-        return td.set("action", self.action_spec.rand(td.batch_size))
+        if self._interval is None:
+            return td.set("action", self.action_spec.rand(td.batch_size))
+        action = torch.empty(
+            (*td.batch_size, *self._shape), dtype=self._dtype, device=self._device
+        ).uniform_()
+        action = action.mul_(self._interval).add_(self._minimum)
+        # guard against rounding errors, as BoundedTensorSpec.rand does
+        action = torch.max(torch.min(action, self._maximum), self._minimum)
+        return td.set("action", action)
 
 
 def recursive_map_to_cpu(dictionary: OrderedDict) -> OrderedDict:
@@ -498,6 +498,7 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         break_when_any_done: bool = True,
         return_contiguous: bool = True,
         tensordict: Optional[TensorDictBase] = None,
+        out: Optional[TensorDictBase] = None,
     ) -> TensorDictBase:
         """Executes a rollout in the environment.
 
@@ -520,6 +521,14 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             return_contiguous (bool): if False, a LazyStackedTensorDict will be returned. Default is True.
             tensordict (TensorDict, optional): if auto_reset is False, an initial
                 tensordict must be provided.
+            out (TensorDict, optional): a preallocated tensordict of batch-size
+                :obj:`[*env.batch_size, max_steps]` where the trajectory will be
+                written. Its keys must include all the keys of the tensordicts
+                produced during the rollout. Requires :obj:`return_contiguous=True`.
+                If the rollout stops before :obj:`max_steps` (e.g. because a done
+                state is reached), a view on the steps of :obj:`out` that were
+                executed is returned and the remaining steps of :obj:`out` are
+                left untouched (i.e. they may contain stale data).
 
         Returns:
             TensorDict object containing the resulting trajectory.
@@ -541,12 +550,27 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         elif tensordict is None:
             raise RuntimeError("tensordict must be provided when auto_reset is False")
 
+        if out is not None:
+            if not return_contiguous:
+                raise RuntimeError("out can only be used with return_contiguous=True")
+            if out.batch_size != torch.Size([*tensordict.batch_size, max_steps]):
+                raise RuntimeError(
+                    f"expected out to have batch-size {[*tensordict.batch_size, max_steps]} "
+                    f"but got {out.batch_size}"
+                )
+
         if policy is None:
 
             def policy(td):
                 return td.set("action", self.action_spec.rand(self.batch_size))
 
         tensordicts = []
+        # when the length of a contiguous rollout is known in advance (or out is
+        # provided), the trajectory is written in a buffer (out or allocated after
+        # the first step) rather than stacked at the end. Rollouts that may stop
+        # early are stacked to avoid allocating max_steps slots for nothing.
+        preallocate = return_contiguous and (out is not None or not break_when_any_done)
+        out_td = out
         if not self.is_done:
             for i in range(max_steps):
                 if auto_cast_to_device:
@@ -555,7 +579,24 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
                 if auto_cast_to_device:
                     tensordict = tensordict.to(env_device)
                 tensordict = self.step(tensordict)
-                tensordicts.append(tensordict.clone())
+                if not preallocate:
+                    tensordicts.append(tensordict.clone())
+                elif out_td is None:
+                    out_td = (
+                        tensordict.unsqueeze(-1)
+                        .expand(*tensordict.batch_size, max_steps)
+                        .to_tensordict()
+                    )
+                else:
+                    if i == 0:
+                        missing_keys = set(tensordict.flatten_keys(".").keys()) - set(
+                            out_td.flatten_keys(".").keys()
+                        )
+                        if missing_keys:
+                            raise RuntimeError(
+                                f"The keys {sorted(missing_keys)} are missing from out."
+                            )
+                    out_td[..., i].update_(tensordict)
                 if (
                     break_when_any_done and tensordict.get("done").any()
                 ) or i == max_steps - 1:
@@ -572,6 +613,13 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         else:
             raise Exception("reset env before calling rollout!")
 
+        if preallocate:
+            if i < max_steps - 1:
+                # the rollout was interrupted before max_steps, which can only
+                # happen when out is provided: return the steps written in out
+                return out_td[..., : i + 1]
+            return out_td
+
         batch_size = self.batch_size if tensordict is None else tensordict.batch_size
 
         out_td = torch.stack(tensordicts, len(batch_size))
@@ -115,6 +115,9 @@ class GymLikeEnv(_EnvWrapper):
     """
 
     _info_dict_reader: BaseInfoDictReader
+    # whether the tensordict built from read_obs can skip TensorDict checks.
+    # None means that this hasn't been determined yet.
+    _validated: Optional[bool] = None
 
     @classmethod
     def __new__(cls, *args, **kwargs):
@@ -216,8 +219,8 @@ class GymLikeEnv(_EnvWrapper):
         done = self._to_tensor(done, dtype=torch.bool)
         self.is_done = done
 
-        tensordict_out = TensorDict(
-            obs_dict, batch_size=tensordict.batch_size, device=self.device
+        tensordict_out = self._make_tensordict_out(
+            obs_dict, batch_size=tensordict.batch_size
         )
 
         tensordict_out.set("reward", reward)
@@ -227,6 +230,27 @@ class GymLikeEnv(_EnvWrapper):
 
         return tensordict_out
 
+    def _make_tensordict_out(
+        self, obs_dict: Dict[str, Any], batch_size: torch.Size
+    ) -> TensorDictBase:
+        """Builds the output tensordict of :obj:`_step`, skipping the TensorDict checks when they are known to be no-ops.
+
+        The first call runs the checks and verifies that every leaf was stored
+        as is (i.e. no cast or device transfer happened). If so, subsequent
+        calls build the tensordict with :obj:`_run_checks=False`.
+
+        """
+        if self._validated:
+            return TensorDict(
+                obs_dict, batch_size=batch_size, device=self.device, _run_checks=False
+            )
+        tensordict_out = TensorDict(obs_dict, batch_size=batch_size, device=self.device)
+        if self._validated is None:
+            self._validated = all(
+                tensordict_out.get(key) is value for key, value in obs_dict.items()
+            )
+        return tensordict_out
+
     def _reset(
         self, tensordict: Optional[TensorDictBase] = None, **kwargs
     ) -> TensorDictBase:
@@ -20,7 +20,9 @@ from torchrl.envs import GymLikeEnv
 
 try:
     import jax
+    import jax.dlpack
     import jumanji
+    import torch.utils.dlpack
     from jax import numpy as jnp
 
     _has_jumanji = True
@@ -30,9 +32,8 @@ except ImportError as err:
 
 
 def _ndarray_to_tensor(value: Union["jnp.ndarray", np.ndarray], device) -> torch.Tensor:
-    # tensor doesn't support conversion from jnp.ndarray.
     if isinstance(value, jnp.ndarray):
-        value = np.asarray(value)
+        return _jax_to_tensor(value, device)
     # tensor doesn't support unsigned dtypes.
     if value.dtype == np.uint16:
         value = value.astype(np.int16)
@@ -44,6 +45,46 @@ def _ndarray_to_tensor(value: Union["jnp.ndarray", np.ndarray], device) -> torch
     return torch.tensor(value).to(device)
 
 
+def _jax_to_tensor(value: "jnp.ndarray", device) -> torch.Tensor:
+    """Converts a jax array to a tensor that owns its memory.
+
+    The array is read through DLPack (which avoids a round-trip through host
+    memory when jax runs on an accelerator) and copied once on the target device:
+    the resulting tensors end up in env tensordicts that can be modified in-place
+    (e.g. by the collectors), whereas jax buffers are immutable and may be shared
+    with other arrays (such as state fields passed through by the step function).
+
+    """
+    # tensor doesn't support unsigned dtypes.
+    if value.dtype == jnp.uint16:
+        value = value.astype(jnp.int16)
+    elif value.dtype == jnp.uint32:
+        value = value.astype(jnp.int32)
+    elif value.dtype == jnp.uint64:
+        value = value.astype(jnp.int64)
+    elif value.dtype == jnp.bool_:
+        # boolean arrays can't always be exchanged through DLPack.
+        return torch.tensor(np.asarray(value), device=device)
+    tensor = torch.utils.dlpack.from_dlpack(jax.dlpack.to_dlpack(value))
+    if tensor.device != torch.device(device):
+        # the transfer already allocates new memory
+        return tensor.to(device)
+    return tensor.clone()
+
+
+def _tensor_to_ndarray(value: torch.Tensor) -> "jnp.ndarray":
+    """Converts a tensor to a jax array, sharing its buffer through DLPack whenever possible."""
+    value = value.detach()
+    if not jax.config.jax_enable_x64 and value.dtype in (torch.int64, torch.float64):
+        # jax would downcast the array anyway: go through numpy.
+        return value.cpu().numpy()
+    try:
+        return jax.dlpack.from_dlpack(torch.utils.dlpack.to_dlpack(value.contiguous()))
+    except RuntimeError:
+        # the device (or dtype) is not supported by the jax backend
+        return value.cpu().numpy()
+
+
 def _object_to_tensordict(obj: Union, device, batch_size) -> TensorDictBase:
     """Converts a namedtuple or a dataclass to a TensorDict."""
     t = {}
@@ -72,9 +113,14 @@ def _tensordict_to_object(tensordict: TensorDictBase, object_example):
             t[name] = _tensordict_to_object(value, getattr(object_example, name))
         else:
             example = getattr(object_example, name)
-            t[name] = (
-                value.detach().numpy().reshape(example.shape).astype(example.dtype)
-            )
+            # reshape and cast with torch so that jax only imports the buffer
+            value = value.reshape(example.shape)
+            dtype = numpy_to_torch_dtype_dict.get(np.dtype(example.dtype))
+            if dtype is not None:
+                t[name] = _tensor_to_ndarray(value.to(dtype))
+            else:
+                # unsigned dtypes have no torch counterpart
+                t[name] = _tensor_to_ndarray(value).astype(example.dtype)
     return object_type(**t)
 
 
@@ -195,7 +241,7 @@ class JumanjiWrapper(GymLikeEnv):
     def _make_state_example(self, env):
         key = jax.random.PRNGKey(0)
         keys = jax.random.split(key, self.batch_size.numel())
-        state, _ = jax.vmap(env.reset)(jnp.stack(keys))
+        state, _ = jax.vmap(env.reset)(keys)
         state = self._reshape(state)
         return state
 
@@ -248,13 +294,27 @@ class JumanjiWrapper(GymLikeEnv):
             raise TypeError("env is not of type 'jumanji.env.Environment'.")
 
     def _init_env(self):
-        pass
+        # batched reset and step are compiled once per env instance
+        self._jit_reset = jax.jit(jax.vmap(self._env.reset))
+        self._jit_step = jax.jit(jax.vmap(self._env.step))
+        # the scan length is read from the actions, jit caches one trace per shape
+        step_fn = jax.vmap(self._env.step)
+        self._jit_scan = jax.jit(
+            lambda state, actions: jax.lax.scan(step_fn, state, actions)
+        )
 
     def _set_seed(self, seed):
         if seed is None:
             raise Exception("Jumanji requires an integer seed.")
         self.key = jax.random.PRNGKey(seed)
 
+    def read_action(self, action):
+        if isinstance(self.action_spec, OneHotDiscreteTensorSpec):
+            action = action.argmax(-1)
+        elif isinstance(self.action_spec, DiscreteTensorSpec):
+            action = action.squeeze(-1)
+        return _tensor_to_ndarray(action)
+
     def read_state(self, state):
         state_dict = _object_to_tensordict(state, self.device, self.batch_size)
         return self._state_spec.encode(state_dict)
@@ -278,7 +338,7 @@ class JumanjiWrapper(GymLikeEnv):
         action = self._flatten(action)
 
         # jax vectorizing map on env.step
-        state, timestep = jax.vmap(self._env.step)(state, action)
+        state, timestep = self._jit_step(state, action)
 
         # reshape batch size from vector
         state = self._reshape(state)
@@ -287,18 +347,16 @@ class JumanjiWrapper(GymLikeEnv):
         # collect outputs
         state_dict = self.read_state(state)
         obs_dict = self.read_obs(timestep.observation)
-        reward = self.read_reward(reward, np.asarray(timestep.reward))
-        done = torch.tensor(
-            np.asarray(timestep.step_type == self.lib.types.StepType.LAST)
+        reward = self.read_reward(reward, _jax_to_tensor(timestep.reward, self.device))
+        done = _jax_to_tensor(
+            timestep.step_type == self.lib.types.StepType.LAST, self.device
         )
 
         self._is_done = done
 
         # build results
-        tensordict_out = TensorDict(
-            source=obs_dict,
-            batch_size=tensordict.batch_size,
-            device=self.device,
+        tensordict_out = self._make_tensordict_out(
+            obs_dict, batch_size=tensordict.batch_size
         )
         tensordict_out.set("reward", reward)
         tensordict_out.set("done", done)
@@ -311,10 +369,11 @@ class JumanjiWrapper(GymLikeEnv):
     ) -> TensorDictBase:
 
         # generate random keys
-        self.key, *keys = jax.random.split(self.key, self.numel() + 1)
+        keys = jax.random.split(self.key, self.numel() + 1)
+        self.key, keys = keys[0], keys[1:]
 
         # jax vectorizing map on env.reset
-        state, timestep = jax.vmap(self._env.reset)(jnp.stack(keys))
+        state, timestep = self._jit_reset(keys)
 
         # reshape batch size from vector
         state = self._reshape(state)
@@ -338,6 +397,21 @@ class JumanjiWrapper(GymLikeEnv):
 
         return tensordict_out
 
+    def _jit_rollout(self, state, actions):
+        """Executes a sequence of actions from a given state in a single compiled call.
+
+        The step loop is expressed as a :obj:`jax.lax.scan` and jitted.
+
+        Args:
+            state: a jumanji state with a flattened batch dimension.
+            actions (jnp.ndarray): the actions to execute, of shape
+                ``[n_steps, batch, *action_shape]``.
+
+        Returns: the final state and the timesteps stacked along the first dimension.
+
+        """
+        return self._jit_scan(state, actions)
+
     def _reshape(self, x):
         shape, n = self.batch_size, 1
         return jax.tree_util.tree_map(lambda x: x.reshape(shape + x.shape[n:]), x)
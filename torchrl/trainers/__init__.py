@@ -3,17 +3,34 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from .trainers import (
-    Trainer,
-    BatchSubSampler,
-    CountFramesLog,
-    LogReward,
-    Recorder,
-    ReplayBuffer,
-    RewardNormalizer,
-    SelectKeys,
-    UpdateWeights,
-    ClearCudaCache,
-)
+import importlib
+
+# the trainers module is only imported when one of its classes is accessed
+_LAZY = {
+    "Trainer": "trainers",
+    "BatchSubSampler": "trainers",
+    "CountFramesLog": "trainers",
+    "LogReward": "trainers",
+    "Recorder": "trainers",
+    "ReplayBuffer": "trainers",
+    "RewardNormalizer": "trainers",
+    "SelectKeys": "trainers",
+    "UpdateWeights": "trainers",
+    "ClearCudaCache": "trainers",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module("." + _LAZY[name], __name__)
+    return getattr(module, name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
 
 # from .loggers import *